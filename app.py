@@ -1,5 +1,6 @@
 from flask import Flask, request, jsonify, render_template
 import logging
+import os
 import traceback
 import time
 from optimizer import optimize_portfolio
@@ -42,7 +43,9 @@ def optimize():
                 'note': 'Please provide at least 2 different cryptocurrencies to optimize.'
             }), 400
         
-        # Get live prices
+        # Get live prices (runs on this request thread; under gunicorn's gthread
+        # workers concurrent requests overlap their API waits, and each upstream
+        # call is bounded by its own HTTP timeout)
         logger.info(f"Getting prices for {list(holdings.keys())}")
         prices = get_live_prices(list(holdings.keys()))
         
@@ -115,9 +118,14 @@ def index():
     return render_template('index.html')
 
 if __name__ == '__main__':
-    # Try a different port if 5001 is in use
+    # Development server only; see the README for running under gunicorn.
+    # Set FLASK_DEBUG=1 to enable the reloader and debugger.
+    debug = os.environ.get('FLASK_DEBUG') == '1'
+    port = int(os.environ.get('PORT', 5001))
+    
+    # Try a different port if the default is in use
     try:
-        app.run(debug=True, host='0.0.0.0', port=5001)
+        app.run(debug=debug, host='0.0.0.0', port=port)
     except OSError:
-        logger.info("Port 5001 in use, trying 5002")
-        app.run(debug=True, host='0.0.0.0', port=5002)
+        logger.info(f"Port {port} in use, trying {port + 1}")
+        app.run(debug=debug, host='0.0.0.0', port=port + 1)
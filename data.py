@@ -1,11 +1,30 @@
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
 import numpy as np
 import os
 import json
 import time
+import threading
+import queue
+import tempfile
 from datetime import datetime, timedelta
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+
+# orjson is optional; it makes cache reads and writes considerably faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# pyarrow is optional; when present, processed price series are cached as Parquet
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -65,45 +84,299 @@ symbol_to_id = {
     'ETC': 'ethereum-classic'
 }
 
+# Symbols with a known CoinGecko ID, for fast membership checks
+_SUPPORTED_SYMBOLS = frozenset(symbol_to_id)
+
+# How long fetched live prices are reused, and how long to wait on an in-flight fetch
+LIVE_PRICE_TTL_SECONDS = 60
+LIVE_PRICE_WAIT_SECONDS = 30
+
+# In-process live price cache: {(symbols, use_multiple_sources): (fetched_at, prices)}
+# and in-flight fetches: {key: {'done': threading.Event, 'result': prices or None}}
+_live_price_cache = {}
+_live_price_in_flight = {}
+_live_price_lock = threading.Lock()
+
+# In-process listing of CACHE_DIR: {filename: mtime}, refreshed lazily via os.scandir
+CACHE_INDEX_REFRESH_SECONDS = 30
+_cache_index = {}
+_cache_index_ts = 0.0
+
+# Recently completed outlier checks: {(symbols, rounded price sum): checked_at}
+OUTLIER_CHECK_TTL_SECONDS = 60
+_outlier_checks = {}
+
+# Background cache writer batching
+CACHE_WRITE_BATCH_SIZE = 16
+CACHE_WRITE_BATCH_SECONDS = 0.2
+
+# Maximum number of concurrent historical data downloads
+HISTORY_FETCH_WORKERS = 8
+
 # Cache management functions
 def get_cache_path(coin_id, days):
-    return os.path.join(CACHE_DIR, f"{coin_id}_{days}days.json")
+    return os.path.join(CACHE_DIR, f"{coin_id}_{days}days.npy")
+
+def _dumps_json(obj):
+    """Serialize to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+def _loads_json(raw):
+    """Parse JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _get_cache_index():
+    """Return {filename: mtime} for CACHE_DIR, rescanning it at most every 30 seconds."""
+    global _cache_index, _cache_index_ts
+    now = time.time()
+    if now - _cache_index_ts > CACHE_INDEX_REFRESH_SECONDS:
+        with os.scandir(CACHE_DIR) as entries:
+            _cache_index = {e.name: e.stat().st_mtime for e in entries if e.is_file()}
+        _cache_index_ts = now
+    return _cache_index
 
-def save_to_cache(coin_id, days, data):
+def _cached_file_age(cache_path):
+    """Age in seconds of a cache file according to the index, or None if absent."""
+    mtime = _get_cache_index().get(os.path.basename(cache_path))
+    if mtime is None:
+        return None
+    return time.time() - mtime
+
+def _atomic_write(cache_path, write):
+    """
+    Write a cache file via write(f) on a unique temp file in the same directory,
+    then rename it into place. Readers in any worker process see either the old
+    or the new file, never a partial one; the temp file is removed on failure.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path),
+                                    prefix=f"{os.path.basename(cache_path)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    _get_cache_index()[os.path.basename(cache_path)] = time.time()
+
+def save_prices_npy(coin_id, days, prices, validators=None):
+    """
+    Cache [[timestamp_ms, price], ...] pairs as a binary (N, 2) float64 array,
+    along with the HTTP validators (ETag / Last-Modified) of the response.
+    """
     cache_path = get_cache_path(coin_id, days)
-    with open(cache_path, 'w') as f:
-        json.dump({
-            'timestamp': time.time(),
-            'data': data
-        }, f)
+    arr = np.asarray(prices, dtype=np.float64).reshape(-1, 2)
+    
+    try:
+        _atomic_write(cache_path, lambda f: np.save(f, arr))
+    except Exception as e:
+        # The old series is still in place, and so are the validators that describe it
+        logger.warning(f"Error saving cache for {coin_id}: {e}")
+        return
+    
+    save_http_validators(coin_id, days, validators, arr)
 
-def load_from_cache(coin_id, days, max_age_hours=24):
+def load_prices_npy(coin_id, days, max_age_hours=24):
+    """Memory-map a cached (N, 2) price array, or return None if missing or stale."""
     cache_path = get_cache_path(coin_id, days)
-    if not os.path.exists(cache_path):
+    
+    # Check if cache exists and is still valid (max_age_hours=None accepts any age)
+    file_age = _cached_file_age(cache_path)
+    if file_age is None or (max_age_hours is not None and file_age > max_age_hours * 3600):
         return None
     
     try:
-        with open(cache_path, 'r') as f:
-            cache_data = json.load(f)
-        
-        # Check if cache is still valid
-        cache_age = time.time() - cache_data['timestamp']
-        if cache_age > max_age_hours * 3600:
-            return None
-        
-        return cache_data['data']
+        return np.load(cache_path, mmap_mode='r')
     except Exception as e:
         logger.warning(f"Error loading cache for {coin_id}: {e}")
         return None
 
+def load_latest_prices(coin_ids):
+    """
+    Return {coin_id: [timestamp_ms, price]} with the newest point of any fresh
+    cached series of each coin, read from the last row of the memory-mapped .npy.
+    """
+    days_by_coin = {coin_id: [] for coin_id in coin_ids}
+    for name in list(_get_cache_index()):
+        if name.endswith('days.npy'):
+            coin_id, _, days = name[:-len('days.npy')].rpartition('_')
+            if coin_id in days_by_coin and days.isdigit():
+                days_by_coin[coin_id].append(int(days))
+    
+    latest = {}
+    for coin_id, days_list in days_by_coin.items():
+        for days in days_list:
+            cached_prices = load_prices_npy(coin_id, days)
+            if cached_prices is None or len(cached_prices) == 0:
+                continue
+            point = [float(cached_prices[-1, 0]), float(cached_prices[-1, 1])]
+            if coin_id not in latest or point[0] > latest[coin_id][0]:
+                latest[coin_id] = point
+    return latest
+
+def get_validators_path(coin_id, days):
+    return os.path.join(CACHE_DIR, f"{coin_id}_{days}days.validators.json")
+
+def _series_fingerprint(arr):
+    """Identify a cached (N, 2) series by its length and newest point."""
+    if arr is None or len(arr) == 0:
+        return None
+    return [len(arr), float(arr[-1, 0]), float(arr[-1, 1])]
+
+def load_http_validators(coin_id, days):
+    """Return the stored {'ETag': ..., 'Last-Modified': ...} for a cached series."""
+    cache_path = get_validators_path(coin_id, days)
+    if os.path.basename(cache_path) not in _get_cache_index():
+        return {}
+    
+    try:
+        with open(cache_path, 'rb') as f:
+            stored = _loads_json(f.read())
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Error loading HTTP validators for {coin_id}: {e}")
+        return {}
+    
+    # Only trust validators recorded for the series that is on disk now; another
+    # worker may have replaced it (e.g. with CoinAPI data) since they were written
+    series = stored.pop('series', None)
+    if series is None or series != _series_fingerprint(load_prices_npy(coin_id, days, max_age_hours=None)):
+        return {}
+    return stored
+
+def save_http_validators(coin_id, days, validators, arr):
+    """
+    Store (or clear) the HTTP validators of the cached series arr. Each series has
+    its own file, tagged with the series it describes, so workers never overwrite
+    each other's entries or pair an ETag with a different series.
+    """
+    cache_path = get_validators_path(coin_id, days)
+    try:
+        if validators:
+            stored = dict(validators, series=_series_fingerprint(arr))
+            _atomic_write(cache_path, lambda f: f.write(_dumps_json(stored)))
+        else:
+            # The new series has no validators; drop any that described the old one
+            try:
+                os.remove(cache_path)
+            except FileNotFoundError:
+                pass
+            _get_cache_index().pop(os.path.basename(cache_path), None)
+    except Exception as e:
+        logger.warning(f"Error saving HTTP validators for {coin_id}: {e}")
+
+def get_conditional_headers(coin_id, days):
+    """Build If-None-Match / If-Modified-Since headers for a cached series, if any."""
+    if _cached_file_age(get_cache_path(coin_id, days)) is None:
+        return None
+    
+    validators = load_http_validators(coin_id, days)
+    headers = {}
+    if validators.get('ETag'):
+        headers['If-None-Match'] = validators['ETag']
+    if validators.get('Last-Modified'):
+        headers['If-Modified-Since'] = validators['Last-Modified']
+    return headers or None
+
+def get_frame_cache_path(coin_id, days):
+    return os.path.join(CACHE_DIR, f"{coin_id}_{days}days.parquet")
+
+def save_df_to_cache(coin_id, days, df):
+    """Persist a processed price DataFrame so cache hits skip JSON parsing."""
+    if not PARQUET_AVAILABLE:
+        return
+    
+    cache_path = get_frame_cache_path(coin_id, days)
+    try:
+        _atomic_write(cache_path, lambda f: df.to_parquet(f, compression='zstd'))
+    except Exception as e:
+        logger.warning(f"Error saving frame cache for {coin_id}: {e}")
+
+def load_df_from_cache(coin_id, days, max_age_hours=24):
+    """Load a processed price DataFrame, or None if missing or stale."""
+    if not PARQUET_AVAILABLE:
+        return None
+    
+    cache_path = get_frame_cache_path(coin_id, days)
+    
+    # Check if cache exists and is still valid
+    file_age = _cached_file_age(cache_path)
+    if file_age is None or file_age > max_age_hours * 3600:
+        return None
+    
+    try:
+        return pd.read_parquet(cache_path)
+    except Exception as e:
+        logger.warning(f"Error loading frame cache for {coin_id}: {e}")
+        return None
+
+def _queue_cache_write(write, *args):
+    """Hand a cache write to the background writer so requests don't wait on disk."""
+    _cache_write_queue.put((write, args))
+
+def _cache_writer_loop():
+    while True:
+        # Collect up to CACHE_WRITE_BATCH_SIZE writes or wait CACHE_WRITE_BATCH_SECONDS
+        batch = [_cache_write_queue.get()]
+        deadline = time.time() + CACHE_WRITE_BATCH_SECONDS
+        while len(batch) < CACHE_WRITE_BATCH_SIZE:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_cache_write_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
+        for write, args in batch:
+            try:
+                write(*args)
+            except Exception as e:
+                logger.warning(f"Background cache write failed: {e}")
+            finally:
+                _cache_write_queue.task_done()
+
+_cache_write_queue = queue.Queue()
+threading.Thread(target=_cache_writer_loop, name='cache-writer', daemon=True).start()
+
+# Shared HTTP session so TCP/TLS connections are reused across API calls
+_session = requests.Session()
+_session.headers.update({'User-Agent': 'CryptoPortfolioOptimizer/1.0'})
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=0)
+_session.mount('https://', _adapter)
+
+# Returned by api_call_with_retry when a conditional request gets a 304
+NOT_MODIFIED = object()
+
 # API call with rate limiting and retries
-def api_call_with_retry(url, max_retries=3, backoff_factor=0.5, headers=None):
-    if headers is None:
-        headers = {'User-Agent': 'CryptoPortfolioOptimizer/1.0'}
+def api_call_with_retry(url, max_retries=3, backoff_factor=0.5, headers=None,
+                        conditional_headers=None, validators=None):
+    """
+    GET a JSON API endpoint, retrying on rate limits and transient errors.
+    
+    conditional_headers (If-None-Match / If-Modified-Since) are sent with the
+    request, and a 304 response returns NOT_MODIFIED. If a validators dict is
+    passed, it is filled with the response's ETag / Last-Modified values.
+    """
+    if conditional_headers:
+        headers = {**(headers or {}), **conditional_headers}
     
     for attempt in range(max_retries):
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            # Per-call headers are merged with the session defaults
+            response = _session.get(url, headers=headers, timeout=10)
+            
+            # Our cached copy is still current
+            if response.status_code == 304:
+                return NOT_MODIFIED
             
             # Handle rate limiting
             if response.status_code == 429:
@@ -114,6 +387,12 @@ def api_call_with_retry(url, max_retries=3, backoff_factor=0.5, headers=None):
                 
             # Handle other errors
             response.raise_for_status()
+            
+            if validators is not None:
+                for name in ('ETag', 'Last-Modified'):
+                    if response.headers.get(name):
+                        validators[name] = response.headers[name]
+            
             return response.json()
             
         except requests.exceptions.RequestException as e:
@@ -125,12 +404,24 @@ def api_call_with_retry(url, max_retries=3, backoff_factor=0.5, headers=None):
     
     return None
 
+def _coinapi_history_to_pairs(data):
+    """Convert CoinAPI history rows into [[timestamp_ms, price], ...] pairs."""
+    if not data:
+        return []
+    
+    # Parse all period starts in one vectorized call instead of per-row datetimes
+    starts = pd.to_datetime([item['time_period_start'] for item in data], utc=True)
+    timestamps = (starts.as_unit('ms').asi8 // 1000 * 1000).tolist()
+    return [[ts, item['rate_close']] for ts, item in zip(timestamps, data)]
+
 # Alternative data sources for price data
 DATA_SOURCES = {
     'coingecko': {
         'name': 'CoinGecko',
         'price_url': 'https://api.coingecko.com/api/v3/simple/price?ids={ids}&vs_currencies=usd',
         'history_url': 'https://api.coingecko.com/api/v3/coins/{id}/market_chart?vs_currency=usd&days={days}',
+        'max_ids_per_request': 25,  # Keeps the batch URL well under length limits
+        'max_concurrent_requests': 4,
         'extract_price': lambda data, coin_id: data.get(coin_id, {}).get('usd'),
         'extract_history': lambda data: data.get('prices', [])
     },
@@ -139,8 +430,9 @@ DATA_SOURCES = {
         'price_url': 'https://rest.coinapi.io/v1/exchangerate/{id}/USD',
         'history_url': 'https://rest.coinapi.io/v1/exchangerate/{id}/USD/history?period_id=1DAY&time_start={time_start}&time_end={time_end}',
         'headers': {'X-CoinAPI-Key': os.environ.get('COINAPI_KEY', '')},
+        'max_concurrent_requests': 4,  # Per-coin requests in flight at once
         'extract_price': lambda data, _: data.get('rate'),
-        'extract_history': lambda data: [[int(datetime.fromisoformat(item['time_period_start'].replace('Z', '+00:00')).timestamp()) * 1000, item['rate_close']] for item in data]
+        'extract_history': lambda data: _coinapi_history_to_pairs(data)
     }
 }
 
@@ -155,39 +447,97 @@ def validate_price_data(prices, symbols):
     if missing:
         return False, f"Missing prices for: {', '.join(missing)}"
     
-    # Check for zero or negative prices
-    invalid = [s for s in symbols if s in prices and (prices[s] <= 0 or prices[s] is None)]
-    if invalid:
+    # Check for zero, negative or missing prices (None becomes NaN here)
+    symbols = list(symbols)
+    current = np.array([prices[s] for s in symbols], dtype=np.float64)
+    invalid_mask = ~(current > 0)
+    if invalid_mask.any():
+        invalid = [s for s, bad in zip(symbols, invalid_mask) if bad]
         return False, f"Invalid prices for: {', '.join(invalid)}"
     
-    # Check for extreme outliers compared to cached data
-    outliers = []
-    for symbol in symbols:
-        if symbol not in prices:
-            continue
-        
-        # Compare with recent cached data if available
-        cached_data = load_from_cache(symbol_to_id.get(symbol, ''), 7)
-        if cached_data and 'prices' in cached_data and len(cached_data['prices']) > 0:
-            latest_cached = cached_data['prices'][-1][1]
-            current = prices[symbol]
-            
-            # Flag if price differs by more than 50% from cached
-            if latest_cached > 0 and abs(current - latest_cached) / latest_cached > 0.5:
-                outliers.append(symbol)
+    # Nothing cached yet (cold start), so there is nothing to compare against
+    latest = load_latest_prices([symbol_to_id[s] for s in symbols if s in symbol_to_id])
+    if not latest:
+        return True, None
+    
+    # Skip the outlier check if these same prices were checked moments ago
+    check_key = (tuple(sorted(symbols)), round(float(current.sum()), 2))
+    now = time.time()
+    checked_at = _outlier_checks.get(check_key)
+    if checked_at is not None and now - checked_at < OUTLIER_CHECK_TTL_SECONDS:
+        return True, None
+    if len(_outlier_checks) > 256:
+        _outlier_checks.clear()
+    _outlier_checks[check_key] = now
     
-    if outliers:
+    # Check for extreme outliers compared to the latest cached prices,
+    # ignoring baselines older than the 24 hour cache TTL
+    cutoff_ms = (time.time() - 24 * 3600) * 1000
+    baselines = [latest.get(symbol_to_id.get(s, '')) for s in symbols]
+    cached = np.array([b[1] if b and b[0] >= cutoff_ms else np.nan for b in baselines], dtype=np.float64)
+    if np.isnan(cached).all():
+        return True, None
+    
+    # Flag if price differs by more than 50% from cached
+    with np.errstate(divide='ignore', invalid='ignore'):
+        outlier_mask = (cached > 0) & (np.abs(current - cached) / cached > 0.5)
+    
+    if outlier_mask.any():
+        outliers = [s for s, flagged in zip(symbols, outlier_mask) if flagged]
         logger.warning(f"Possible price outliers detected for: {', '.join(outliers)}")
         # We don't fail validation for outliers, just log a warning
     
     return True, None
 
-# Get live prices for multiple coins with multiple data sources and validation
+# Get live prices for multiple coins, coalescing concurrent and repeated requests
 def get_live_prices(symbols, use_multiple_sources=True):
-    valid_symbols = [s for s in symbols if s in symbol_to_id]
+    valid_symbols = [s for s in symbols if s in _SUPPORTED_SYMBOLS]
     if not valid_symbols:
         return {}
     
+    key = (tuple(sorted(set(valid_symbols))), use_multiple_sources)
+    
+    while True:
+        with _live_price_lock:
+            cached = _live_price_cache.get(key)
+            if cached and time.time() - cached[0] < LIVE_PRICE_TTL_SECONDS:
+                return dict(cached[1])
+            
+            in_flight = _live_price_in_flight.get(key)
+            if in_flight is None:
+                # Nobody is fetching these prices yet, so this request does it
+                in_flight = {'done': threading.Event(), 'result': None}
+                _live_price_in_flight[key] = in_flight
+                break
+        
+        # Another request is already fetching the same prices; wait for it and
+        # share its result, valid or not, so a failing upstream is hit once per flight
+        in_flight['done'].wait(timeout=LIVE_PRICE_WAIT_SECONDS)
+        if in_flight['result'] is not None:
+            return dict(in_flight['result'])
+    
+    try:
+        prices, is_valid = _fetch_live_prices(valid_symbols, use_multiple_sources)
+        # Only reuse prices that passed validation, so one bad upstream response
+        # is retried by the next request instead of being served for a minute
+        if prices and is_valid:
+            now = time.time()
+            with _live_price_lock:
+                for stale_key in [k for k, (fetched_at, _) in _live_price_cache.items()
+                                  if now - fetched_at >= LIVE_PRICE_TTL_SECONDS]:
+                    del _live_price_cache[stale_key]
+                _live_price_cache[key] = (now, dict(prices))
+        in_flight['result'] = dict(prices)
+    finally:
+        with _live_price_lock:
+            _live_price_in_flight.pop(key, None)
+        in_flight['done'].set()
+    
+    return prices
+
+# Get live prices from the data sources with validation and fallbacks;
+# returns (prices, is_valid) where is_valid is the final validation result
+def _fetch_live_prices(valid_symbols, use_multiple_sources=True):
     # Try primary data source first (CoinGecko)
     prices = _get_prices_from_source('coingecko', valid_symbols)
     
@@ -224,7 +574,7 @@ def get_live_prices(symbols, use_multiple_sources=True):
     if not is_valid:
         logger.error("Could not get valid price data from any source")
     
-    return prices
+    return prices, is_valid
 
 # Get prices from a specific data source
 def _get_prices_from_source(source_key, symbols):
@@ -234,37 +584,50 @@ def _get_prices_from_source(source_key, symbols):
     
     source = DATA_SOURCES[source_key]
     prices = {}
+    pairs = [(s, symbol_to_id[s]) for s in symbols if s in _SUPPORTED_SYMBOLS]
     
     try:
         if source_key == 'coingecko':
-            # CoinGecko allows batch requests
-            ids = [symbol_to_id[s] for s in symbols if s in symbol_to_id]
-            url = source['price_url'].format(ids="%2C".join(ids))
-            data = api_call_with_retry(url, headers=source.get('headers'))
+            # CoinGecko allows batch requests, but keep each URL to a bounded
+            # number of ids and send the batches concurrently
+            ids = [coin_id for _, coin_id in pairs]
+            batch_size = source['max_ids_per_request']
+            batches = [ids[i:i + batch_size] for i in range(0, len(ids), batch_size)]
+            
+            def fetch_batch(batch_ids):
+                url = source['price_url'].format(ids="%2C".join(batch_ids))
+                return api_call_with_retry(url, headers=source.get('headers'))
+            
+            data = {}
+            if batches:
+                max_workers = min(source['max_concurrent_requests'], len(batches))
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    for batch_data in executor.map(fetch_batch, batches):
+                        if batch_data:
+                            data.update(batch_data)
             
             if data:
-                for symbol in symbols:
-                    if symbol in symbol_to_id:
-                        coin_id = symbol_to_id[symbol]
-                        price = source['extract_price'](data, coin_id)
-                        if price is not None:
-                            prices[symbol] = price
+                for symbol, coin_id in pairs:
+                    price = source['extract_price'](data, coin_id)
+                    if price is not None:
+                        prices[symbol] = price
         
         elif source_key == 'coinapi':
-            # CoinAPI requires individual requests
-            for symbol in symbols:
-                if symbol in symbol_to_id:
-                    coin_id = symbol_to_id[symbol]
-                    url = source['price_url'].format(id=coin_id)
-                    data = api_call_with_retry(url, headers=source.get('headers'))
-                    
-                    if data:
-                        price = source['extract_price'](data, None)
-                        if price is not None:
-                            prices[symbol] = price
-                    
-                    # Avoid rate limiting
-                    time.sleep(0.5)
+            # CoinAPI requires individual requests, so run them concurrently
+            # on a small worker pool that stays within the rate limit
+            def fetch_price(coin_id):
+                url = source['price_url'].format(id=coin_id)
+                data = api_call_with_retry(url, headers=source.get('headers'))
+                return source['extract_price'](data, None) if data else None
+            
+            if pairs:
+                max_workers = min(source['max_concurrent_requests'], len(pairs))
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    results = list(executor.map(fetch_price, [coin_id for _, coin_id in pairs]))
+                
+                for (symbol, _), price in zip(pairs, results):
+                    if price is not None:
+                        prices[symbol] = price
     
     except Exception as e:
         logger.error(f"Error getting prices from {source['name']}: {str(e)}")
@@ -275,84 +638,115 @@ def _get_prices_from_source(source_key, symbols):
 def get_fallback_prices(symbols, days=7):
     prices = {}
     for symbol in symbols:
-        if symbol not in symbol_to_id:
+        if symbol not in _SUPPORTED_SYMBOLS:
             continue
             
         coin_id = symbol_to_id[symbol]
-        cached_data = load_from_cache(coin_id, days)
+        cached_prices = load_prices_npy(coin_id, days)
         
-        if cached_data and 'prices' in cached_data and len(cached_data['prices']) > 0:
+        if cached_prices is not None and len(cached_prices) > 0:
             # Get the most recent price
-            latest_price = cached_data['prices'][-1][1]
-            prices[symbol] = latest_price
+            prices[symbol] = float(cached_prices[-1, 1])
     
     return prices
 
+def _prices_to_series(symbol, prices_data):
+    """Convert [[timestamp_ms, price], ...] pairs into a daily price Series."""
+    arr = np.asarray(prices_data, dtype=np.float64).reshape(-1, 2)
+    index = pd.to_datetime(arr[:, 0].astype(np.int64), unit='ms', utc=True).tz_convert(None).floor('D')
+    series = pd.Series(arr[:, 1], index=index, name=symbol).sort_index()
+    
+    # Keep the last observation of each calendar day
+    return series[~series.index.duplicated(keep='last')]
+
 # Get historical price data with caching and multiple sources
 def get_historical_prices(symbols, days=60, use_multiple_sources=True):
     """Get historical price data for multiple symbols."""
-    valid_symbols = [s for s in symbols if s in symbol_to_id]
+    valid_symbols = [s for s in symbols if s in _SUPPORTED_SYMBOLS]
     if not valid_symbols:
         return pd.DataFrame(), []
     
-    all_prices = []
-    missing_symbols = []
+    price_series = {}
+    cache_misses = []
     
+    # First pass: serve whatever we can from the cache
     for symbol in valid_symbols:
         coin_id = symbol_to_id[symbol]
         
-        # Try to load from cache first
-        cached_data = load_from_cache(coin_id, days)
-        if cached_data:
+        # Prefer the columnar cache, which loads without any per-point parsing
+        cached_frame = load_df_from_cache(coin_id, days)
+        if cached_frame is not None and not cached_frame.empty:
+            price_series[symbol] = cached_frame.iloc[:, 0].rename(symbol)
+            continue
+        
+        cached_prices = load_prices_npy(coin_id, days)
+        if cached_prices is not None and len(cached_prices) > 0:
             try:
-                # Convert millisecond timestamps to datetime
-                prices_data = cached_data['prices']
-                timestamps = [datetime.fromtimestamp(ts/1000) for ts, _ in prices_data]
-                values = [price for _, price in prices_data]
-                prices = pd.DataFrame({symbol: values}, index=timestamps)
-                all_prices.append(prices)
+                series = _prices_to_series(symbol, cached_prices)
+                price_series[symbol] = series
+                _queue_cache_write(save_df_to_cache, coin_id, days, series.to_frame())
                 continue
             except Exception as e:
                 logger.warning(f"Error processing cached data for {symbol}: {e}")
         
-        # If cache miss, fetch from API
-        success = False
-        
-        # Try primary source first
-        data = _get_historical_data('coingecko', coin_id, days)
-        
-        if not data and use_multiple_sources:
-            # Try alternative source
-            data = _get_historical_data('coinapi', coin_id, days)
-        
-        if data:
-            success = True
-            # Convert millisecond timestamps to datetime
-            prices_data = data['prices']
-            timestamps = [datetime.fromtimestamp(ts/1000) for ts, _ in prices_data]
-            values = [price for _, price in prices_data]
-            prices = pd.DataFrame({symbol: values}, index=timestamps)
-            all_prices.append(prices)
-            save_to_cache(coin_id, days, data)
-        
-        if not success:
-            missing_symbols.append(symbol)
-            logger.warning(f"Could not fetch historical data for {symbol}")
+        cache_misses.append((symbol, coin_id))
     
-    if not all_prices:
-        return pd.DataFrame(), valid_symbols
+    # Second pass: fetch cache misses from the APIs concurrently
+    if cache_misses:
+        max_workers = min(HISTORY_FETCH_WORKERS, len(cache_misses))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(_fetch_historical_data, coin_id, days, use_multiple_sources): (symbol, coin_id)
+                for symbol, coin_id in cache_misses
+            }
+            
+            for future in as_completed(futures):
+                symbol, coin_id = futures[future]
+                data = future.result()
+                if data:
+                    series = _prices_to_series(symbol, data['prices'])
+                    price_series[symbol] = series
+                    # Keep the raw prices too; the fallback price lookup reads them
+                    _queue_cache_write(save_prices_npy, coin_id, days, data['prices'], data.get('validators'))
+                    _queue_cache_write(save_df_to_cache, coin_id, days, series.to_frame())
     
-    # Combine all price data
-    combined_prices = pd.concat(all_prices, axis=1)
-    combined_prices.index = pd.to_datetime(combined_prices.index)  # Ensure datetime index
-    combined_prices = combined_prices.sort_index()
+    # Keep the caller's symbol order regardless of completion order
+    series_map = {
+        symbol: price_series[symbol] for symbol in valid_symbols
+        if symbol in price_series and not price_series[symbol].empty
+    }
+    missing_symbols = [symbol for symbol in valid_symbols if symbol not in series_map]
+    for symbol in missing_symbols:
+        logger.warning(f"Could not fetch historical data for {symbol}")
+    
+    if not series_map:
+        return pd.DataFrame(), valid_symbols
     
-    # Resample to daily frequency and forward fill missing values
-    combined_prices = combined_prices.resample('D').last()
-    combined_prices = combined_prices.fillna(method='ffill').fillna(method='bfill')
+    # Combine all price data in one pass, aligned onto a continuous daily range
+    start = min(series.index[0] for series in series_map.values())
+    end = max(series.index[-1] for series in series_map.values())
+    daily_index = pd.date_range(start, end, freq='D')
+    combined_prices = pd.DataFrame(series_map, index=daily_index)
+    combined_prices = combined_prices.ffill().bfill()
     
     return combined_prices, missing_symbols
 
+@lru_cache(maxsize=512)
+def _history_url(source_key, coin_id, days):
+    """Build (and memoize) the id/days history URL for a data source."""
+    return DATA_SOURCES[source_key]['history_url'].format(id=coin_id, days=days)
+
+def _fetch_historical_data(coin_id, days, use_multiple_sources=True):
+    """Fetch historical data for one coin, falling back to alternative sources."""
+    # Try primary source first
+    data = _get_historical_data('coingecko', coin_id, days)
+    
+    if not data and use_multiple_sources:
+        # Try alternative source
+        data = _get_historical_data('coinapi', coin_id, days)
+    
+    return data
+
 def _get_historical_chunk(source_key, coin_id, days, start_date, end_date):
     """Get historical data chunk from specified source."""
     source = DATA_SOURCES.get(source_key)
@@ -361,7 +755,7 @@ def _get_historical_chunk(source_key, coin_id, days, start_date, end_date):
     
     try:
         if source_key == 'coingecko':
-            url = source['history_url'].format(id=coin_id, days=days)
+            url = _history_url(source_key, coin_id, days)
             data = api_call_with_retry(url, headers=source.get('headers'))
             if data:
                 return source['extract_history'](data)
@@ -387,10 +781,23 @@ def _get_historical_data(source_key, coin_id, days):
     
     try:
         if source_key == 'coingecko':
-            url = source['history_url'].format(id=coin_id, days=days)
-            data = api_call_with_retry(url, headers=source.get('headers'))
+            url = _history_url(source_key, coin_id, days)
+            
+            # Revalidate a previous download instead of fetching it again
+            validators = {}
+            conditional_headers = get_conditional_headers(coin_id, days)
+            data = api_call_with_retry(url, headers=source.get('headers'),
+                                       conditional_headers=conditional_headers,
+                                       validators=validators)
+            if data is NOT_MODIFIED:
+                cached_prices = load_prices_npy(coin_id, days, max_age_hours=None)
+                if cached_prices is not None and get_conditional_headers(coin_id, days) == conditional_headers:
+                    return {'prices': cached_prices.tolist(), 'validators': load_http_validators(coin_id, days)}
+                # The cache vanished or was replaced by another worker after the
+                # request was made, so fetch the full body
+                data = api_call_with_retry(url, headers=source.get('headers'), validators=validators)
             if data:
-                return {'prices': source['extract_history'](data)}
+                return {'prices': source['extract_history'](data), 'validators': validators}
         elif source_key == 'coinapi':
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days)
@@ -3,17 +3,83 @@ import numpy as np
 import logging
 import json
 from datetime import datetime, timedelta
-from pypfopt import EfficientFrontier, risk_models, expected_returns, objective_functions, plotting
+from pypfopt import EfficientFrontier, risk_models, objective_functions, plotting
 from pypfopt.discrete_allocation import DiscreteAllocation
 from pypfopt.efficient_frontier import EfficientFrontier
 import matplotlib.pyplot as plt
 import io
 import base64
-from scipy import stats
+import cvxpy as cp
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# numba is optional; when present, the price fill loop is JIT-compiled
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 # Get logger
 logger = logging.getLogger('crypto-optimizer')
 
+if njit is not None:
+    @njit(cache=True)
+    def _ffill_bfill_kernel(a):
+        """Forward-fill then backward-fill NaNs down each column of a, in place."""
+        T, N = a.shape
+        for j in range(N):
+            last = np.nan
+            for i in range(T):
+                if np.isnan(a[i, j]):
+                    a[i, j] = last
+                else:
+                    last = a[i, j]
+            last = np.nan
+            for i in range(T - 1, -1, -1):
+                if np.isnan(a[i, j]):
+                    a[i, j] = last
+                else:
+                    last = a[i, j]
+else:
+    _ffill_bfill_kernel = None
+
+def _ffill_bfill(values):
+    """Forward-fill then backward-fill NaNs down each column of a 2D array (returns a copy)."""
+    arr = np.array(values, dtype=np.float64)
+    if _ffill_bfill_kernel is not None:
+        _ffill_bfill_kernel(arr)
+        return arr
+    
+    mask = np.isnan(arr)
+    if not mask.any():
+        return arr
+    
+    rows = np.arange(arr.shape[0])[:, None]
+    cols = np.arange(arr.shape[1])
+    
+    # Forward fill: take each cell from the last valid row at or above it
+    idx = np.where(mask, 0, rows)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    arr = arr[idx, cols]
+    
+    # Backward fill what's left (leading NaNs) from the first valid row below
+    mask = np.isnan(arr)
+    if mask.any():
+        idx = np.where(mask, arr.shape[0] - 1, rows)
+        idx = np.minimum.accumulate(idx[::-1], axis=0)[::-1]
+        arr = arr[idx, cols]
+    
+    return arr
+
+
+def _round_list(arr, nd=6):
+    """Convert a float array to (nested) lists rounded to nd decimals, with NaN/inf as None."""
+    arr = np.round(np.asarray(arr, dtype=np.float64), nd)
+    out = arr.astype(object)
+    out[~np.isfinite(arr)] = None
+    return out.tolist()
+
+
 def validate_price_data(hist_prices, lookback_days):
     """
     Validate historical price data for quality and completeness.
@@ -43,32 +109,263 @@ def validate_price_data(hist_prices, lookback_days):
         is_valid = False if missing_pct > 20 else is_valid
     
     # Fill missing values with forward fill then backward fill
-    cleaned_data = hist_prices.ffill().bfill()
+    cleaned_data = pd.DataFrame(_ffill_bfill(hist_prices.to_numpy()), index=hist_prices.index, columns=hist_prices.columns)
     
     # Check for extreme returns that might indicate data errors
     daily_returns = cleaned_data.pct_change().dropna()
+    r = daily_returns.to_numpy()
+    abs_r = np.abs(r)
     
     # Identify extreme daily returns (>30% in a day is suspicious for most coins)
-    extreme_returns = (daily_returns.abs() > 0.3).any(axis=1)
-    extreme_days = extreme_returns.sum()
+    extreme_days = int((abs_r > 0.3).any(axis=1).sum())
     if extreme_days > 0:
         issues.append(f"Found {extreme_days} days with extreme price movements (>30% daily change)")
     
     # Check for stale prices (no change for multiple days)
-    stale_days = (daily_returns.abs() < 0.0001).all(axis=1).sum()
+    stale_days = int((abs_r < 0.0001).all(axis=1).sum())
     if stale_days > lookback_days * 0.1:  # More than 10% of days have no price movement
         issues.append(f"Found {stale_days} days with potentially stale prices (no movement)")
         is_valid = False if stale_days > lookback_days * 0.3 else is_valid
     
-    # Check for statistical outliers using z-score
-    z_scores = stats.zscore(daily_returns, nan_policy='omit')
-    outliers = (np.abs(z_scores) > 3).any(axis=1).sum()
+    # Check for statistical outliers using z-score (|r - mean| > 3 std);
+    # flat columns get a unit std so they never count as outliers
+    mean = r.mean(axis=0, keepdims=True)
+    std = r.std(axis=0, keepdims=True)
+    std[std == 0] = 1.0
+    deviation = r - mean
+    np.abs(deviation, out=deviation)
+    outliers = int((deviation > 3 * std).any(axis=1).sum())
     if outliers > lookback_days * 0.1:
         issues.append(f"Found {outliers} statistical outliers in daily returns")
     
     return is_valid, issues, cleaned_data
 
 
+def _cholesky_factor(S_arr):
+    """Lower Cholesky factor L of S (plus a tiny ridge), so a portfolio's volatility is ||L'w||."""
+    n = len(S_arr)
+    # A tiny ridge keeps the factorization stable for near-singular covariances
+    ridge = 1e-10 * max(np.trace(S_arr) / n, 1e-12)
+    return np.linalg.cholesky(S_arr + ridge * np.eye(n))
+
+
+def _portfolio_volatility(weights, S_arr, L=None):
+    """Volatility of weights, via the Cholesky factor L when one is available."""
+    if L is not None:
+        return float(np.linalg.norm(L.T @ weights))
+    return float(np.sqrt(max(weights @ S_arr @ weights, 0.0)))
+
+
+def _solve_simplex_qp(mu_arr, S_arr, delta, w0, max_iter=None, tol=1e-10):
+    """
+    Minimize delta/2 w'Sw - mu'w over {w : sum(w) = 1, w >= 0} exactly with a
+    primal active-set method, warm-started from the feasible point w0.
+    
+    Each iteration solves the KKT system of the assets currently allowed to be
+    non-zero, so a warm start from a nearby solution usually finishes in one or
+    two iterations.
+    
+    Returns:
+        optimal weights, or None if the active set did not settle within max_iter
+    """
+    n = len(mu_arr)
+    if max_iter is None:
+        max_iter = 4 * n + 10
+    w = np.array(w0, dtype=np.float64)
+    fixed = w <= 0.0
+    w[fixed] = 0.0
+    
+    for _ in range(max_iter):
+        free = np.flatnonzero(~fixed)
+        k = len(free)
+        
+        # KKT system on the free assets: delta S_FF w_F + nu 1 = mu_F, sum(w_F) = 1
+        kkt = np.zeros((k + 1, k + 1))
+        kkt[:k, :k] = delta * S_arr[np.ix_(free, free)]
+        kkt[:k, k] = 1.0
+        kkt[k, :k] = 1.0
+        solution = np.linalg.solve(kkt, np.append(mu_arr[free], 1.0))
+        target, nu = solution[:k], solution[k]
+        step = target - w[free]
+        
+        if np.abs(step).max() <= tol:
+            # Stationary on the free set; release the fixed asset with the most
+            # negative multiplier, or stop if every multiplier is non-negative
+            multipliers = delta * (S_arr[fixed] @ w) - mu_arr[fixed] + nu
+            if len(multipliers) == 0 or multipliers.min() >= -tol:
+                return w
+            fixed[np.flatnonzero(fixed)[np.argmin(multipliers)]] = False
+            continue
+        
+        # Move towards the free-set optimum until the first weight hits zero
+        shrinking = step < 0
+        ratios = np.full(k, np.inf)
+        ratios[shrinking] = -w[free][shrinking] / step[shrinking]
+        blocking = np.argmin(ratios)
+        alpha = min(1.0, ratios[blocking])
+        w[free] += alpha * step
+        if alpha < 1.0:
+            w[free[blocking]] = 0.0
+            fixed[free[blocking]] = True
+    
+    return None
+
+
+def _parametric_frontier(mu, S, n_points=15):
+    """
+    Trace the long-only efficient frontier by sweeping the risk aversion delta in
+    max mu'w - delta/2 w'Sw, warm-starting each exact solve from the previous one.
+    
+    A coarse sweep of n_points deltas locates the frontier; each returned point
+    is then solved at the delta interpolated for an evenly spaced volatility.
+    
+    Args:
+        mu: Expected returns
+        S: Covariance matrix
+        n_points: Number of frontier points to return
+        
+    Returns:
+        list of dicts with volatility and return values, ordered by volatility
+    """
+    mu_arr = np.ascontiguousarray(mu, dtype=np.float64)
+    S_arr = np.asfortranarray(S, dtype=np.float64)
+    n = len(mu_arr)
+    L = _cholesky_factor(S_arr)
+    
+    def solve(delta, w0):
+        weights = _solve_simplex_qp(mu_arr, S_arr, delta, w0)
+        if weights is None:
+            raise ValueError(f"active-set solve did not converge at delta={delta:.3g}")
+        return weights, _portfolio_volatility(weights, S_arr, L), float(mu_arr @ weights)
+    
+    # Coarse sweep from (almost) minimum variance to (almost) maximum return
+    max_eigenvalue = max(np.linalg.eigvalsh(S_arr)[-1], 1e-12)
+    scale = (np.abs(mu_arr).max() + 1e-12) / max_eigenvalue
+    log_deltas = np.log(scale) + np.linspace(3, -2, n_points) * np.log(10)
+    
+    weights = np.full(n, 1.0 / n)
+    sweep_weights, vols, rets = [], [], []
+    for log_delta in log_deltas:
+        weights, vol, ret = solve(np.exp(log_delta), weights)
+        sweep_weights.append(weights)
+        vols.append(vol)
+        rets.append(ret)
+    
+    vols = np.array(vols)
+    rets = np.array(rets)
+    if not (np.isfinite(vols).all() and np.isfinite(rets).all()):
+        raise ValueError("non-finite frontier point")
+    
+    # Limit to 150% of the max Sharpe volatility (at least 60%), as before
+    max_sharpe_vol = vols[np.argmax(rets / np.maximum(vols, 1e-12))]
+    max_vol = min(vols.max(), max(max_sharpe_vol * 1.5, 0.6))
+    
+    # Volatility rises as delta falls, so interpolate log(delta) for evenly spaced
+    # targets and re-solve from the nearest sweep point
+    sweep_vols = np.maximum.accumulate(vols)
+    points = []
+    for target in np.linspace(vols.min(), max_vol, n_points):
+        nearest = int(np.abs(sweep_vols - target).argmin())
+        delta = np.exp(np.interp(target, sweep_vols, log_deltas))
+        _, vol, ret = solve(delta, sweep_weights[nearest])
+        points.append((vol, ret))
+    
+    points = sorted(set(points))
+    return [{'volatility': vol, 'return': ret} for vol, ret in points]
+
+
+def _solve_one(mu, S, target_risk, max_weight, problems=None, L=None):
+    """
+    Solve for the max-return portfolio at one target volatility.
+    
+    Args:
+        mu: Expected returns array
+        S: Covariance matrix array
+        target_risk: Volatility cap for this point
+        max_weight: Upper bound on each asset weight
+        problems: Optional threading.local used to keep one canonicalized problem per thread
+        L: Optional Cholesky factor of S used to evaluate the volatility
+        
+    Returns:
+        dict with volatility and return, or None if the solve failed
+    """
+    try:
+        problem = getattr(problems, 'problem', None)
+        if problem is None:
+            # Carry sigma**2 as its own parameter so the problem stays DPP and
+            # re-solves skip canonicalization
+            w = cp.Variable(len(mu))
+            sigma_sq = cp.Parameter(nonneg=True)
+            variance = cp.quad_form(w, cp.psd_wrap(S))
+            prob = cp.Problem(cp.Maximize(mu @ w), [variance <= sigma_sq, cp.sum(w) == 1, w >= 0, w <= max_weight])
+            problem = (prob, sigma_sq, w)
+            if problems is not None:
+                problems.problem = problem
+        prob, sigma_sq, w = problem
+        
+        sigma_sq.value = target_risk ** 2
+        prob.solve(warm_start=True)
+        if prob.status not in ('optimal', 'optimal_inaccurate'):
+            return None
+        # Evaluate return and volatility straight from the weight vector
+        weights = w.value
+        return {'volatility': _portfolio_volatility(weights, S, L), 'return': float(mu @ weights)}
+    except Exception:
+        # Just skip problematic points without logging to reduce noise
+        return None
+
+
+def _solver_frontier(mu, S):
+    """Generate frontier points by re-solving one parametrized CVXPY problem per target risk."""
+    mu_arr = np.ascontiguousarray(mu, dtype=np.float64)
+    S_arr = np.asfortranarray(S, dtype=np.float64)
+    n = len(mu_arr)
+    w = cp.Variable(n)
+    variance = cp.quad_form(w, cp.psd_wrap(S_arr))
+    budget = [cp.sum(w) == 1, w >= 0, w <= 1]
+    
+    # Factor S once for every volatility evaluation below (None if S is not positive definite)
+    try:
+        L = _cholesky_factor(S_arr)
+    except np.linalg.LinAlgError:
+        L = None
+    
+    # First try to get min volatility portfolio
+    try:
+        cp.Problem(cp.Minimize(variance), budget).solve()
+        min_vol = _portfolio_volatility(w.value, S_arr, L)
+    except Exception as e:
+        logger.warning(f"Could not calculate min volatility portfolio: {e}")
+        # Use a reasonable default if min_vol calculation fails
+        min_vol = 0.15  # 15% volatility as fallback
+    
+    # Then try to get max sharpe portfolio (min variance of y with mu @ y == 1, w = y / sum(y))
+    try:
+        y = cp.Variable(n)
+        cp.Problem(cp.Minimize(cp.quad_form(y, cp.psd_wrap(S_arr))), [mu_arr @ y == 1, y >= 0]).solve()
+        y_arr = y.value / y.value.sum()
+        max_sharpe_vol = _portfolio_volatility(y_arr, S_arr, L)
+    except Exception as e:
+        logger.warning(f"Could not calculate max sharpe portfolio: {e}")
+        # Use a reasonable default if max_sharpe calculation fails
+        max_sharpe_vol = 0.4  # 40% volatility as fallback
+    
+    # Use a range from 90% of min_vol to 150% of max_sharpe_vol
+    # Make sure the range is reasonable even with fallback values
+    min_risk = min(min_vol * 0.9, 0.1)  # At least 10% volatility
+    max_risk = max(max_sharpe_vol * 1.5, 0.6)  # At most 60% volatility
+    risk_range = np.linspace(min_risk, max_risk, 15)  # Reduced from 20 to 15 points
+    
+    # Solve the points concurrently; each worker thread reuses its own parametrized problem
+    problems = threading.local()
+    with ThreadPoolExecutor(max_workers=min(8, len(risk_range))) as executor:
+        futures = [executor.submit(_solve_one, mu_arr, S_arr, target_risk, 1.0, problems, L) for target_risk in risk_range]
+        results = [future.result() for future in futures]
+    frontier_points = [point for point in results if point is not None]
+    
+    return frontier_points
+
+
 def generate_efficient_frontier_data(ef, mu, S, risk_range=None):
     """
     Generate a set of points along the efficient frontier for visualization.
@@ -83,48 +380,11 @@ def generate_efficient_frontier_data(ef, mu, S, risk_range=None):
         list of dicts with volatility and return values
     """
     try:
-        # Create a new EfficientFrontier object to avoid modifying the original
-        frontier_ef = EfficientFrontier(mu, S, weight_bounds=(0, 1))
-        
-        # First try to get min volatility portfolio
         try:
-            min_vol_weights = frontier_ef.min_volatility()
-            min_vol = frontier_ef.portfolio_performance()[1]
+            frontier_points = _parametric_frontier(mu, S)
         except Exception as e:
-            logger.warning(f"Could not calculate min volatility portfolio: {e}")
-            # Use a reasonable default if min_vol calculation fails
-            min_vol = 0.15  # 15% volatility as fallback
-        
-        # Reset the efficient frontier object
-        frontier_ef = EfficientFrontier(mu, S, weight_bounds=(0, 1))
-        
-        # Then try to get max sharpe portfolio
-        try:
-            max_sharpe_weights = frontier_ef.max_sharpe()
-            max_sharpe_vol = frontier_ef.portfolio_performance()[1]
-        except Exception as e:
-            logger.warning(f"Could not calculate max sharpe portfolio: {e}")
-            # Use a reasonable default if max_sharpe calculation fails
-            max_sharpe_vol = 0.4  # 40% volatility as fallback
-        
-        # Use a range from 90% of min_vol to 150% of max_sharpe_vol
-        # Make sure the range is reasonable even with fallback values
-        min_risk = min(min_vol * 0.9, 0.1)  # At least 10% volatility
-        max_risk = max(max_sharpe_vol * 1.5, 0.6)  # At most 60% volatility
-        risk_range = np.linspace(min_risk, max_risk, 15)  # Reduced from 20 to 15 points
-        
-        # Generate efficient frontier points
-        frontier_points = []
-        for target_risk in risk_range:
-            try:
-                # Reset the efficient frontier for each calculation
-                point_ef = EfficientFrontier(mu, S, weight_bounds=(0, 1))
-                point_ef.efficient_risk(target_risk)
-                ret, vol, _ = point_ef.portfolio_performance()
-                frontier_points.append({'volatility': vol, 'return': ret})
-            except Exception as e:
-                # Just skip problematic points without logging to reduce noise
-                continue
+            logger.warning(f"Parametric frontier failed, solving point by point: {e}")
+            frontier_points = _solver_frontier(mu, S)
         
         # Make sure we have at least some points
         if len(frontier_points) < 3:
@@ -134,7 +394,9 @@ def generate_efficient_frontier_data(ef, mu, S, risk_range=None):
                 ret = 0.05 + (vol * 1.2)  # Simple risk-return relationship
                 frontier_points.append({'volatility': vol, 'return': ret})
         
-        return frontier_points
+        # Round for the frontend; plotting doesn't need full float64 precision
+        points = _round_list([[p['volatility'], p['return']] for p in frontier_points])
+        return [{'volatility': vol, 'return': ret} for vol, ret in points]
     
     except Exception as e:
         logger.error(f"Failed to generate efficient frontier: {e}")
@@ -147,63 +409,63 @@ def generate_efficient_frontier_data(ef, mu, S, risk_range=None):
         return fallback_points
 
 
-def generate_correlation_matrix(hist_prices):
+def generate_correlation_matrix(hist_prices, returns=None):
     """
     Generate correlation matrix from historical prices.
     
     Args:
         hist_prices: DataFrame of historical prices
+        returns: Optional precomputed daily percentage returns
         
     Returns:
-        DataFrame with correlation matrix
+        dict with the asset list and the row-major upper triangle (diagonal included)
     """
     # Calculate daily returns
-    returns = hist_prices.pct_change().dropna()
-    
-    # Calculate correlation matrix
-    correlation_matrix = returns.corr()
-    
-    # Convert to list format for frontend
-    assets = correlation_matrix.index.tolist()
-    corr_data = []
+    if returns is None:
+        returns = hist_prices.pct_change().dropna()
     
-    for i, asset1 in enumerate(assets):
-        row = []
-        for j, asset2 in enumerate(assets):
-            row.append(correlation_matrix.loc[asset1, asset2])
-        corr_data.append(row)
+    # Calculate correlation matrix: covariance scaled in place by 1/std on both axes
+    correlation_matrix = np.cov(returns.to_numpy(), rowvar=False)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d = np.sqrt(1.0 / np.diag(correlation_matrix))
+        correlation_matrix *= d
+        correlation_matrix *= d[:, None]
     
-    return corr_data
+    # The matrix is symmetric, so only send the upper triangle; the frontend expands it
+    n = len(correlation_matrix)
+    return {
+        'assets': returns.columns.tolist(),
+        'upper': _round_list(correlation_matrix[np.triu_indices(n)])
+    }
 
 
-def generate_historical_returns(hist_prices):
+def generate_historical_returns(hist_prices, returns=None):
     """
     Generate historical returns data for visualization.
     
     Args:
         hist_prices: DataFrame of historical prices
+        returns: Optional precomputed daily percentage returns
         
     Returns:
         dict with dates and normalized returns
     """
     # Calculate daily returns
-    returns = hist_prices.pct_change().dropna()
+    if returns is None:
+        returns = hist_prices.pct_change().dropna()
     
     # Normalize to start at 1.0
-    cumulative_returns = (1 + returns).cumprod()
+    cumulative_returns = np.cumprod(1.0 + returns.to_numpy(), axis=0)
     
     # Convert to dict format for frontend
     # Handle different index types (DatetimeIndex or regular Index)
-    if hasattr(cumulative_returns.index, 'strftime'):
-        dates = cumulative_returns.index.strftime('%Y-%m-%d').tolist()
+    if hasattr(returns.index, 'strftime'):
+        dates = returns.index.strftime('%Y-%m-%d').tolist()
     else:
         # Convert index to strings if it's not a DatetimeIndex
-        dates = [str(idx) for idx in cumulative_returns.index.tolist()]
-    
-    assets_data = {}
+        dates = [str(idx) for idx in returns.index.tolist()]
     
-    for column in cumulative_returns.columns:
-        assets_data[column] = cumulative_returns[column].tolist()
+    assets_data = {column: _round_list(cumulative_returns[:, i]) for i, column in enumerate(returns.columns)}
     
     return {
         'dates': dates,
@@ -211,16 +473,50 @@ def generate_historical_returns(hist_prices):
     }
 
 
-def compute_rolling_metrics(prices_df, risk_free_rate=0.0, window=30):
+def estimate_returns(returns, span, frequency=252):
+    """
+    Estimate annualized EMA, mean and CAPM returns in one pass over daily returns.
+    
+    Uses the same formulas as PyPortfolioOpt's ema_historical_return,
+    mean_historical_return and capm_return (compounded, equal-weighted market
+    proxy, zero risk-free rate), but shares a single returns matrix between them.
+    
+    Args:
+        returns: DataFrame of daily percentage returns
+        span: Span for the exponentially weighted mean
+        frequency: Number of periods per year
+        
+    Returns:
+        tuple: (ema_returns, mean_returns, capm_returns) as Series
+    """
+    r = returns.to_numpy()
+    n_days = r.shape[0]
+    
+    ema_returns = (1 + returns.ewm(span=span).mean().iloc[-1].to_numpy()) ** frequency - 1
+    mean_returns = np.prod(1 + r, axis=0) ** (frequency / n_days) - 1
+    
+    # CAPM with the equal-weighted portfolio as the market proxy
+    market = r.mean(axis=1)
+    cov = np.cov(np.column_stack([r, market]), rowvar=False)
+    betas = cov[:-1, -1] / cov[-1, -1]
+    market_return = np.prod(1 + market) ** (frequency / n_days) - 1
+    capm_returns = betas * market_return
+    
+    return tuple(pd.Series(values, index=returns.columns) for values in (ema_returns, mean_returns, capm_returns))
+
+
+def compute_rolling_metrics(prices_df, risk_free_rate=0.0, window=30, log_returns=None):
     """
     Compute rolling Sharpe ratio and volatility for each asset and the portfolio.
-    Returns a dict for frontend visualization.
+    Returns a dict for frontend visualization. Pass log_returns to reuse
+    daily log returns that were already computed from prices_df.
     """
     import pandas as pd
     import numpy as np
     if prices_df.isnull().all().all():
         return {}
-    log_returns = np.log(prices_df / prices_df.shift(1)).dropna()
+    if log_returns is None:
+        log_returns = np.log(prices_df).diff().dropna()
     rolling_vol = log_returns.rolling(window).std() * np.sqrt(252)
     rolling_mean = log_returns.rolling(window).mean() * 252
     rolling_sharpe = (rolling_mean - risk_free_rate) / rolling_vol
@@ -229,22 +525,27 @@ def compute_rolling_metrics(prices_df, risk_free_rate=0.0, window=30):
     port_rolling_vol = port_log_ret.rolling(window).std() * np.sqrt(252)
     port_rolling_mean = port_log_ret.rolling(window).mean() * 252
     port_rolling_sharpe = (port_rolling_mean - risk_free_rate) / port_rolling_vol
+    # Every row from window-1 on has a full window; non-finite values
+    # (e.g. a flat price series) are emitted as null
+    valid = slice(window - 1, None)
+    vol_cols = _round_list(rolling_vol.iloc[valid].to_numpy().T)
+    sharpe_cols = _round_list(rolling_sharpe.iloc[valid].to_numpy().T)
     # Dates
-    dates = log_returns.index.strftime('%Y-%m-%d').tolist()
+    dates = log_returns.index[valid].strftime('%Y-%m-%d').tolist()
     return {
-        'dates': dates[-len(port_rolling_vol):],
+        'dates': dates,
         'assets': {col: {
-            'volatility': rolling_vol[col].dropna().tolist(),
-            'sharpe': rolling_sharpe[col].dropna().tolist()
-        } for col in log_returns.columns},
+            'volatility': vol_cols[i],
+            'sharpe': sharpe_cols[i]
+        } for i, col in enumerate(log_returns.columns)},
         'portfolio': {
-            'volatility': port_rolling_vol.dropna().tolist(),
-            'sharpe': port_rolling_sharpe.dropna().tolist()
+            'volatility': _round_list(port_rolling_vol.iloc[valid].to_numpy()),
+            'sharpe': _round_list(port_rolling_sharpe.iloc[valid].to_numpy())
         }
     }
 
 # Main optimization function
-def optimize_portfolio(holdings, risk_method='max_sharpe', preferences=None, prices=None, lookback_days=60, risk_free_rate=0.0):
+def optimize_portfolio(holdings, risk_method='max_sharpe', preferences=None, prices=None, lookback_days=60, risk_free_rate=0.0, visualization=True):
     """
     Optimize a crypto portfolio based on historical data.
     
@@ -260,6 +561,8 @@ def optimize_portfolio(holdings, risk_method='max_sharpe', preferences=None, pri
             - 'target_volatility': float, target volatility for efficient_risk method
         prices: dict {symbol: price} (for calculating current value)
         lookback_days: int, number of days of history to use
+        visualization: bool, whether to also build the frontier, correlation,
+            historical returns and rolling metrics data (skip when only weights are needed)
         
     Returns:
         dict with optimization results and visualization data
@@ -313,12 +616,12 @@ def optimize_portfolio(holdings, risk_method='max_sharpe', preferences=None, pri
     if data_issues:
         logger.warning(f"Data quality issues detected: {'; '.join(data_issues)}")
     
-    # Store historical returns for visualization
-    historical_returns_data = generate_historical_returns(cleaned_hist_prices)
+    # Daily returns, computed once and shared by the estimators and visualizations
+    pct_returns = cleaned_hist_prices.pct_change().dropna()
+    log_returns = np.log1p(pct_returns)
     
     try:
-        # Calculate log returns for robust annualization
-        log_returns = np.log(cleaned_hist_prices / cleaned_hist_prices.shift(1)).dropna()
+        # Use log returns for robust annualization
         mean_log_return_daily = log_returns.mean()
         # Annualized expected return (log):
         ann_log_return = mean_log_return_daily * 252
@@ -328,18 +631,17 @@ def optimize_portfolio(holdings, risk_method='max_sharpe', preferences=None, pri
         ann_volatility = log_returns.std() * np.sqrt(252)
         
         # Calculate expected returns using multiple methods as before
-        ema_returns = expected_returns.ema_historical_return(cleaned_hist_prices, span=lookback_days//3)
-        mean_returns = expected_returns.mean_historical_return(cleaned_hist_prices)
-        capm_returns = expected_returns.capm_return(cleaned_hist_prices)
+        ema_returns, mean_returns, capm_returns = estimate_returns(pct_returns, span=lookback_days//3)
         
         # Cap extreme returns to more realistic levels
         MAX_ANNUAL_RETURN = 0.75  # 75% annual return cap
         MIN_ANNUAL_RETURN = -0.5  # -50% annual return floor
         
         # Combine all return estimates (including log-based)
-        mu = pd.DataFrame({"ema": ema_returns, "mean": mean_returns, "capm": capm_returns, "log": ann_return})
-        mu = mu.median(axis=1)
-        mu = mu.clip(lower=MIN_ANNUAL_RETURN, upper=MAX_ANNUAL_RETURN)
+        # (all four share the column order of cleaned_hist_prices)
+        estimates = np.stack([ema_returns.to_numpy(), mean_returns.to_numpy(), capm_returns.to_numpy(), ann_return.to_numpy()])
+        mu = np.clip(np.nanmedian(estimates, axis=0), MIN_ANNUAL_RETURN, MAX_ANNUAL_RETURN)
+        mu = pd.Series(mu, index=cleaned_hist_prices.columns)
         
         # For covariance, use shrinkage estimator which is more robust than sample covariance
         S = risk_models.CovarianceShrinkage(cleaned_hist_prices).ledoit_wolf()
@@ -380,14 +682,17 @@ def optimize_portfolio(holdings, risk_method='max_sharpe', preferences=None, pri
         if prices is not None:
             try:
                 # Calculate total portfolio value
-                total_value = sum(holdings[s] * prices.get(s, 0) for s in holdings)
+                held_symbols = list(holdings)
+                amounts = np.fromiter((holdings[s] for s in held_symbols), dtype=np.float64, count=len(held_symbols))
+                unit_prices = np.fromiter((prices.get(s, 0.0) or 0.0 for s in held_symbols), dtype=np.float64, count=len(held_symbols))
+                total_value = float(amounts @ unit_prices)
                 
                 # Convert prices dict to pandas Series for DiscreteAllocation
                 # Only include coins that are in the optimized weights
-                price_series = pd.Series()
-                for symbol in cleaned_weights:
-                    if symbol in prices and prices.get(symbol) is not None:
-                        price_series[symbol] = prices.get(symbol)
+                price_series = pd.Series(
+                    {s: prices[s] for s in cleaned_weights if s in prices and prices[s] is not None},
+                    dtype=np.float64
+                )
                 
                 # Check if we have valid prices for all optimized coins
                 if len(price_series) == len(cleaned_weights) and not price_series.isna().any():
@@ -401,20 +706,6 @@ def optimize_portfolio(holdings, risk_method='max_sharpe', preferences=None, pri
                 logger.warning(f"Error in discrete allocation: {str(e)}")
                 allocation = None
         
-        # Generate efficient frontier data for visualization
-        try:
-            frontier_data = generate_efficient_frontier_data(ef, mu, S)
-        except Exception as e:
-            logger.warning(f"Failed to generate efficient frontier: {e}")
-            frontier_data = []
-            
-        # Generate correlation matrix for visualization
-        try:
-            correlation_data = generate_correlation_matrix(cleaned_hist_prices)
-        except Exception as e:
-            logger.warning(f"Failed to generate correlation matrix: {e}")
-            correlation_data = []
-        
         # Round weights to 4 decimal places
         weights = {k: round(v, 4) for k, v in weights.items() if v > 0.001}
         
@@ -436,15 +727,29 @@ def optimize_portfolio(holdings, risk_method='max_sharpe', preferences=None, pri
             'expected_return': expected_return,
             'volatility': volatility,
             'sharpe_ratio': sharpe,
-            'efficient_frontier': frontier_data,
-            'correlation_matrix': correlation_data,
-            'historical_returns': historical_returns_data,
             'lookback_days': lookback_days,  # Add lookback days to the result
         }
-
-        # Add rolling Sharpe and volatility for frontend visualization
-        result['rolling_metrics'] = compute_rolling_metrics(cleaned_hist_prices, risk_free_rate)
-
+        
+        if visualization:
+            # Generate efficient frontier data for visualization
+            try:
+                result['efficient_frontier'] = generate_efficient_frontier_data(ef, mu, S)
+            except Exception as e:
+                logger.warning(f"Failed to generate efficient frontier: {e}")
+                result['efficient_frontier'] = []
+            
+            # Generate correlation matrix for visualization
+            try:
+                result['correlation_matrix'] = generate_correlation_matrix(cleaned_hist_prices, returns=pct_returns)
+            except Exception as e:
+                logger.warning(f"Failed to generate correlation matrix: {e}")
+                result['correlation_matrix'] = {'assets': [], 'upper': []}
+            
+            # Store historical returns for visualization
+            result['historical_returns'] = generate_historical_returns(cleaned_hist_prices, returns=pct_returns)
+            
+            # Add rolling Sharpe and volatility for frontend visualization
+            result['rolling_metrics'] = compute_rolling_metrics(cleaned_hist_prices, risk_free_rate, log_returns=log_returns)
         
         if note:
             result['note'] = note
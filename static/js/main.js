@@ -891,10 +891,16 @@ function createCorrelationMatrixChart(data) {
     // Clear previous content
     correlationContainer.innerHTML = '';
     
-    // Generate simulated correlation matrix
-    // In a real implementation, this would come from the backend
-    const assets = Object.keys(data.optimized_weights);
-    const correlationMatrix = generateCorrelationMatrix(assets);
+    // Use the backend correlation matrix when present, otherwise fall back to a simulated one
+    const backendCorrelation = data.correlation_matrix;
+    let assets, correlationMatrix;
+    if (backendCorrelation && backendCorrelation.upper && backendCorrelation.upper.length) {
+        assets = backendCorrelation.assets;
+        correlationMatrix = expandUpperTriangle(backendCorrelation.upper, assets.length);
+    } else {
+        assets = Object.keys(data.optimized_weights);
+        correlationMatrix = generateCorrelationMatrix(assets);
+    }
     
     // Create a table-based visualization instead of using heatmap chart type
     // which may not be available in the default Chart.js
@@ -934,7 +940,7 @@ function createCorrelationMatrixChart(data) {
             else if (value > 0.3) colorClass = 'bg-info';
             else if (value < 0) colorClass = 'bg-success text-white';
             
-            tr.innerHTML += `<td class="${colorClass}">${value.toFixed(2)}</td>`;
+            tr.innerHTML += `<td class="${colorClass}">${value === null ? 'n/a' : value.toFixed(2)}</td>`;
         });
         
         tbody.appendChild(tr);
@@ -1096,6 +1102,18 @@ function generateRandomAssetPoints(portfolioVolatility, portfolioReturn, count)
     return points;
 }
 
+// Helper function to rebuild a symmetric matrix from its row-major upper triangle
+function expandUpperTriangle(upper, n) {
+    const matrix = Array(n).fill().map(() => Array(n).fill(0));
+    let k = 0;
+    for (let i = 0; i < n; i++) {
+        for (let j = i; j < n; j++) {
+            matrix[i][j] = matrix[j][i] = upper[k++];
+        }
+    }
+    return matrix;
+}
+
 // Helper function to generate a correlation matrix
 function generateCorrelationMatrix(assets) {
     const n = assets.length;